@@ -14,10 +14,11 @@ from core import (
     parse_input,
 )
 from pdf_label import datamatrix_available, generate_label_pdf
-from printing import print_pdf_lp, has_lp
+from printing import PrinterPool, has_lp, parse_printer_list, print_pdf_lp
 
 
 CSV_PATH = "serials.csv"
+PRINT_TIMEOUT = 60.0
 
 
 class App(tk.Tk):
@@ -39,6 +40,7 @@ class App(tk.Tk):
         self.current_u32 = None
         self.payloads = set()
         self.u32_set = set()
+        self.print_pool = None
 
         self._build_ui()
         self._bind_events()
@@ -61,7 +63,7 @@ class App(tk.Tk):
 
         printer_frame = ttk.Frame(self)
         printer_frame.grid(row=2, column=0, sticky="ew", **padding)
-        ttk.Label(printer_frame, text="Drucker (optional)").grid(row=0, column=0, sticky="w")
+        ttk.Label(printer_frame, text="Drucker (optional, mehrere mit Komma)").grid(row=0, column=0, sticky="w")
         ttk.Entry(printer_frame, textvariable=self.printer_var, width=40).grid(row=1, column=0, sticky="ew")
 
         next_frame = ttk.Frame(self)
@@ -218,7 +220,20 @@ class App(tk.Tk):
             messagebox.showwarning("Warnung", f"lp nicht vorhanden. PDF bleibt liegen: {tmp_path}")
             self._set_status(False, f"lp fehlt. PDF: {tmp_path}")
             return
-        ok, err = print_pdf_lp(tmp_path, self.printer_var.get().strip() or None)
+        printers = parse_printer_list(self.printer_var.get())
+        if len(printers) > 1:
+            try:
+                job = self._get_print_pool(printers).submit(tmp_path)
+            except ValueError as exc:
+                messagebox.showerror("Fehler", f"Druckerpool ungueltig: {exc}\nPDF bleibt liegen: {tmp_path}")
+                self._set_status(False, f"Druckerpool ungueltig. PDF: {tmp_path}")
+                return
+            if job.wait(PRINT_TIMEOUT):
+                ok, err = job.ok, job.error
+            else:
+                ok, err = False, f"Zeitueberschreitung nach {PRINT_TIMEOUT:.0f} s"
+        else:
+            ok, err = print_pdf_lp(tmp_path, printers[0] if printers else None)
         if ok:
             try:
                 os.remove(tmp_path)
@@ -230,6 +245,13 @@ class App(tk.Tk):
             self._set_status(False, f"Druck fehlgeschlagen. PDF: {tmp_path}")
         self._focus_serial()
 
+    def _get_print_pool(self, printers):
+        if self.print_pool is None or self.print_pool.printers() != printers:
+            if self.print_pool is not None:
+                self.print_pool.close(wait=False)
+            self.print_pool = PrinterPool(printers)
+        return self.print_pool
+
     def _on_next(self):
         self._reload_sets()
         try:
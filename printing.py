@@ -1,5 +1,9 @@
+import os
 import shutil
 import subprocess
+import threading
+import time
+from collections import deque
 
 
 def has_lp():
@@ -17,3 +21,253 @@ def print_pdf_lp(path, printer_name=None):
     if result.returncode != 0:
         return False, (result.stderr or "lp Fehler").strip()
     return True, ""
+
+
+POOL_STRATEGIES = ("least_loaded", "round_robin")
+
+
+class PrintJobError(Exception):
+    pass
+
+
+def _pool_sink(path, printer_name):
+    # A missing PDF is the job's fault; the printer stays in the pool.
+    if not os.path.isfile(path):
+        raise PrintJobError(f"PDF nicht gefunden: {path}")
+    return print_pdf_lp(path, printer_name)
+
+
+class PrintJob:
+    def __init__(self, path, submitted):
+        self.path = path
+        self.submitted = submitted
+        self.printer = None
+        self.ok = None
+        self.error = ""
+        self.attempts = 0
+        self.failed_on = []
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _finish(self, ok, error, printer, finished):
+        self.ok = ok
+        self.error = error
+        self.printer = printer
+        self.finished = finished
+        self._done.set()
+
+
+class _PrinterState:
+    def __init__(self, name):
+        self.name = name
+        self.queue = deque()
+        self.busy = False
+        self.down_until = None
+        self.last_error = ""
+        self.jobs_ok = 0
+        self.jobs_failed = 0
+        self.busy_time = 0.0
+        self.latency_total = 0.0
+
+    def load(self):
+        return len(self.queue) + (1 if self.busy else 0)
+
+
+class PrinterPool:
+    def __init__(
+        self, printers, sink=None, strategy="least_loaded", retry_after=30.0, max_attempts=None, clock=time.monotonic
+    ):
+        names = [name for name in (printers or []) if name]
+        if not names:
+            raise ValueError("Keine Drucker konfiguriert.")
+        if len(set(names)) != len(names):
+            raise ValueError("Drucker doppelt konfiguriert.")
+        if strategy not in POOL_STRATEGIES:
+            raise ValueError(f"Unbekannte Strategie: {strategy}")
+        self._sink = sink or _pool_sink
+        self._strategy = strategy
+        self._retry_after = retry_after
+        self._max_attempts = max_attempts or len(names)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._closed = False
+        self._rr_index = 0
+        self._states = [_PrinterState(name) for name in names]
+        self._threads = []
+        for state in self._states:
+            thread = threading.Thread(target=self._worker, args=(state,), name=f"printer-{state.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    def printers(self):
+        return [state.name for state in self._states]
+
+    def submit(self, path):
+        return self.submit_batch([path])[0]
+
+    def submit_batch(self, paths):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Druckerpool ist geschlossen.")
+            now = self._clock()
+            jobs = [PrintJob(path, now) for path in paths]
+            if not jobs:
+                return jobs
+            self._dispatch_locked(jobs, now)
+            self._cond.notify_all()
+        return jobs
+
+    def wait(self, jobs, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in jobs:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not job.wait(remaining):
+                return False
+        return True
+
+    def stats(self):
+        with self._cond:
+            now = self._clock()
+            result = {}
+            for state in self._states:
+                result[state.name] = {
+                    "available": self._available(state, now),
+                    "queued": state.load(),
+                    "ok": state.jobs_ok,
+                    "failed": state.jobs_failed,
+                    "last_error": state.last_error,
+                    "avg_latency": state.latency_total / state.jobs_ok if state.jobs_ok else None,
+                    "throughput": state.jobs_ok / state.busy_time if state.busy_time > 0 else None,
+                }
+            return result
+
+    def close(self, wait=True):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _available(self, state, now):
+        return state.down_until is None or state.down_until <= now
+
+    def _pick_locked(self, now, count=1, exclude=None):
+        candidates = [s for s in self._states if s is not exclude and self._available(s, now)]
+        if not candidates:
+            return []
+        count = min(count, len(candidates))
+        if self._strategy == "round_robin":
+            ordered = []
+            size = len(self._states)
+            for offset in range(size):
+                state = self._states[(self._rr_index + offset) % size]
+                if state in candidates:
+                    ordered.append(state)
+            picked = ordered[:count]
+            self._rr_index = (self._states.index(picked[-1]) + 1) % size
+            return picked
+        order = {id(state): index for index, state in enumerate(self._states)}
+        candidates.sort(key=lambda s: (s.load(), order[id(s)]))
+        return candidates[:count]
+
+    def _dispatch_locked(self, jobs, now, exclude=None, error="Kein Drucker verfuegbar.", printer=None):
+        targets = self._pick_locked(now, count=len(jobs), exclude=exclude)
+        if not targets:
+            for job in jobs:
+                job._finish(False, error, printer, now)
+            return
+        sizes = self._chunk_sizes(targets, len(jobs))
+        # Contiguous chunks keep each printer's share of the lot in order.
+        start = 0
+        for state in self._states:
+            size = sizes.get(id(state), 0)
+            state.queue.extend(jobs[start : start + size])
+            start += size
+
+    def _chunk_sizes(self, targets, count):
+        if self._strategy == "round_robin":
+            chunk, extra = divmod(count, len(targets))
+            return {id(state): chunk + (1 if index < extra else 0) for index, state in enumerate(targets)}
+        # Least-loaded: fill the emptiest queue first so all queues end up level.
+        levels = [state.load() for state in targets]
+        sizes = [0] * len(targets)
+        for _ in range(count):
+            index = min(range(len(targets)), key=lambda i: (levels[i] + sizes[i], i))
+            sizes[index] += 1
+        return {id(state): size for state, size in zip(targets, sizes)}
+
+    def _worker(self, state):
+        while True:
+            with self._cond:
+                while not state.queue and not self._closed:
+                    self._cond.wait()
+                if not state.queue:
+                    return
+                job = state.queue.popleft()
+                job.attempts += 1
+                state.busy = True
+            started = self._clock()
+            job_fault = False
+            try:
+                ok, err = self._sink(job.path, state.name)
+            except PrintJobError as exc:
+                ok, err, job_fault = False, str(exc), True
+            except Exception as exc:
+                ok, err = False, str(exc) or exc.__class__.__name__
+            with self._cond:
+                now = self._clock()
+                state.busy = False
+                state.busy_time += now - started
+                if ok:
+                    state.jobs_ok += 1
+                    state.latency_total += now - job.submitted
+                    job._finish(True, "", state.name, now)
+                else:
+                    self._fail_over_locked(state, job, err or "Druck fehlgeschlagen", now, job_fault)
+                self._cond.notify_all()
+
+    def _fail_over_locked(self, state, job, err, now, job_fault=False):
+        state.jobs_failed += 1
+        state.last_error = err
+        if job_fault:
+            job._finish(False, err, state.name, now)
+            return
+        job.failed_on.append(state.name)
+        state.down_until = now + self._retry_after
+        pending = list(state.queue)
+        state.queue.clear()
+        if len(job.failed_on) >= self._max_attempts:
+            job._finish(False, err, state.name, now)
+        else:
+            pending.insert(0, job)
+        if self._closed:
+            # Workers with empty queues may already have exited.
+            for item in pending:
+                item._finish(False, err, state.name, now)
+            return
+        self._dispatch_locked(pending, now, exclude=state, error=err, printer=state.name)
+
+
+def parse_printer_list(value):
+    names = [name.strip() for name in (value or "").split(",") if name.strip()]
+    return list(dict.fromkeys(names))
+
+
+def pool_from_settings(settings, sink=None, **kwargs):
+    printers = settings.get("printers") or []
+    if not isinstance(printers, list) or not all(isinstance(name, str) for name in printers):
+        raise ValueError("Einstellung 'printers' muss eine Liste von Druckernamen sein.")
+    if not printers and settings.get("printer_name"):
+        printers = [settings["printer_name"]]
+    kwargs.setdefault("strategy", settings.get("printer_strategy") or "least_loaded")
+    return PrinterPool(printers, sink=sink, **kwargs)
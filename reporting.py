@@ -0,0 +1,600 @@
+import argparse
+import bisect
+import csv
+import datetime as dt
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from core import _u32_from_payload, load_serial_sets, sn_from_bytes
+
+
+INDEX_VERSION = 2
+SCAN_BATCH = 100_000
+SAMPLE_BLOCK = 4096
+SAMPLE_COUNT = 16
+
+SERIAL_FIELDS = ["u32_hex", "sn_text"]
+GAP_FIELDS = ["start", "end", "missing"]
+COUNT_FIELDS = ["bucket", "count"]
+THROUGHPUT_FIELDS = ["total", "active_hours", "per_active_hour", "peak_hour", "peak_count"]
+
+
+def index_path_for(csv_path):
+    return csv_path + ".idx.json"
+
+
+def _bucket_key(timestamp):
+    value = (timestamp or "").strip()
+    if not value:
+        return None
+    # append_serial always writes UTC isoformat, so the hour is a plain prefix.
+    if value.endswith("+00:00") and len(value) >= 13:
+        return value[:13]
+    try:
+        parsed = dt.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(dt.timezone.utc)
+    return parsed.strftime("%Y-%m-%dT%H")
+
+
+def _bound_key(value, end=False):
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = dt.date.fromisoformat(text) if len(text) == 10 else dt.datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Ungueltige Zeitangabe: {text}") from None
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(dt.timezone.utc)
+        return value.strftime("%Y-%m-%dT%H")
+    # A bare date covers the whole (UTC) day.
+    return value.strftime("%Y-%m-%dT") + ("23" if end else "00")
+
+
+def _row_u32(row):
+    u32_hex = (row.get("u32_hex") or "").strip()
+    if u32_hex:
+        try:
+            return int(u32_hex, 16)
+        except ValueError:
+            return None
+    return _u32_from_payload(row.get("payload_hex") or row.get("payload") or "")
+
+
+def _encode_runs(runs):
+    # Flat deltas keep the sidecar small: start gap, run length, start gap, ...
+    flat = []
+    previous = 0
+    for start, end in zip(runs.starts, runs.ends):
+        flat.append(start - previous)
+        flat.append(end - start)
+        previous = end
+    return flat
+
+
+def _decode_runs(flat):
+    runs = SerialRuns()
+    previous = 0
+    for i in range(0, len(flat or []) - 1, 2):
+        start = previous + flat[i]
+        previous = start + flat[i + 1]
+        runs.starts.append(start)
+        runs.ends.append(previous)
+    return runs
+
+
+def serial_row(u32):
+    return {"u32_hex": f"{u32:08X}", "sn_text": sn_from_bytes(u32.to_bytes(4, "big"))}
+
+
+class SerialRuns:
+    def __init__(self, runs=None):
+        self.starts = []
+        self.ends = []
+        for start, end in runs or []:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self):
+        return sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+
+    def runs(self):
+        return [[start, end] for start, end in zip(self.starts, self.ends)]
+
+    def add(self, value):
+        i = bisect.bisect_right(self.starts, value)
+        if i > 0 and self.ends[i - 1] >= value:
+            return
+        joins_left = i > 0 and self.ends[i - 1] == value - 1
+        joins_right = i < len(self.starts) and self.starts[i] == value + 1
+        if joins_left and joins_right:
+            self.ends[i - 1] = self.ends[i]
+            del self.starts[i]
+            del self.ends[i]
+        elif joins_left:
+            self.ends[i - 1] = value
+        elif joins_right:
+            self.starts[i] = value
+        else:
+            self.starts.insert(i, value)
+            self.ends.insert(i, value)
+
+    def extend(self, values):
+        new_values = sorted(set(values))
+        if not new_values:
+            return
+        starts = []
+        ends = []
+        i = 0
+        j = 0
+        while i < len(self.starts) or j < len(new_values):
+            if j >= len(new_values) or (i < len(self.starts) and self.starts[i] <= new_values[j]):
+                start, end = self.starts[i], self.ends[i]
+                i += 1
+            else:
+                start = end = new_values[j]
+                j += 1
+            if ends and start <= ends[-1] + 1:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self.starts = starts
+        self.ends = ends
+
+    def __contains__(self, value):
+        i = bisect.bisect_right(self.starts, value)
+        return i > 0 and self.ends[i - 1] >= value
+
+    def _clipped(self, lo, hi):
+        i = max(0, bisect.bisect_right(self.starts, lo) - 1)
+        while i < len(self.starts) and self.starts[i] <= hi:
+            start = max(self.starts[i], lo)
+            end = min(self.ends[i], hi)
+            if start <= end:
+                yield start, end
+            i += 1
+
+    def count(self, lo=0, hi=0xFFFFFFFF):
+        return sum(end - start + 1 for start, end in self._clipped(lo, hi))
+
+    def values(self, lo=0, hi=0xFFFFFFFF):
+        for start, end in self._clipped(lo, hi):
+            yield from range(start, end + 1)
+
+    def gaps(self, lo=0, hi=0xFFFFFFFF):
+        expected = lo
+        for start, end in self._clipped(lo, hi):
+            if start > expected:
+                yield expected, start - 1
+            expected = end + 1
+        if expected <= hi:
+            yield expected, hi
+
+
+class SerialIndex:
+    def __init__(self, csv_path, index_path=None):
+        self.csv_path = csv_path
+        self.index_path = index_path or index_path_for(csv_path)
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.fieldnames = None
+        self.inode = None
+        self.size = None
+        self.mtime_ns = None
+        self.fingerprint = ""
+        self.rows = 0
+        self.hours = {}
+        self.serials = SerialRuns()
+        self.notes = {}
+        self._pending = []
+        self._pending_notes = {}
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        if data.get("version") != INDEX_VERSION:
+            return False
+        self.offset = data.get("offset", 0)
+        self.fieldnames = data.get("fieldnames")
+        self.inode = data.get("inode")
+        self.size = data.get("size")
+        self.mtime_ns = data.get("mtime_ns")
+        self.fingerprint = data.get("fingerprint", "")
+        self.rows = data.get("rows", 0)
+        self.hours = data.get("hours", {})
+        self.serials = _decode_runs(data.get("runs"))
+        self.notes = {note: _decode_runs(runs) for note, runs in data.get("notes", {}).items()}
+        return True
+
+    def save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "offset": self.offset,
+            "fieldnames": self.fieldnames,
+            "inode": self.inode,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "fingerprint": self.fingerprint,
+            "rows": self.rows,
+            "hours": self.hours,
+            "runs": _encode_runs(self.serials),
+            "notes": {note: _encode_runs(runs) for note, runs in self.notes.items()},
+        }
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=True, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self, save=True):
+        if not os.path.exists(self.csv_path):
+            changed = self.offset != 0
+            self._reset()
+            return changed
+        stat = os.stat(self.csv_path)
+        rebuilt = False
+        if self.offset and self._is_stale(stat):
+            self._reset()
+            rebuilt = True
+        if stat.st_size == self.offset and not rebuilt:
+            return False
+        self._scan()
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.fingerprint = self._fingerprint()
+        if save:
+            self.save()
+        return True
+
+    def _is_stale(self, stat):
+        if stat.st_size < self.offset or stat.st_ino != self.inode:
+            return True
+        # Same size but touched since the last refresh means an in-place edit.
+        if stat.st_size == self.size and stat.st_mtime_ns != self.mtime_ns:
+            return True
+        return self._fingerprint() != self.fingerprint
+
+    def _fingerprint(self):
+        # Hash the header, the tail before offset and evenly spaced blocks in
+        # between; edits that shift bytes show up in every later block.
+        digest = hashlib.sha1()
+        with open(self.csv_path, "rb") as f:
+            if self.offset <= SAMPLE_BLOCK * SAMPLE_COUNT:
+                digest.update(f.read(self.offset))
+            else:
+                step = (self.offset - SAMPLE_BLOCK) // (SAMPLE_COUNT - 1)
+                positions = [i * step for i in range(SAMPLE_COUNT - 1)] + [self.offset - SAMPLE_BLOCK]
+                for position in positions:
+                    f.seek(position)
+                    digest.update(f.read(SAMPLE_BLOCK))
+        return digest.hexdigest()
+
+    def _scan(self):
+        with open(self.csv_path, "rb") as f:
+            f.seek(self.offset)
+            position = [self.offset]
+
+            def complete_lines():
+                for line in f:
+                    # A trailing line without newline is still being written.
+                    if not line.endswith(b"\n"):
+                        return
+                    position[0] += len(line)
+                    yield line.decode("utf-8")
+
+            reader = csv.reader(complete_lines())
+            if self.fieldnames is None:
+                self.fieldnames = next(reader, None)
+                if self.fieldnames is None:
+                    return
+                self.offset = position[0]
+            fieldnames = self.fieldnames
+            for values in reader:
+                self._add_row(dict(zip(fieldnames, values)))
+                self.offset = position[0]
+                if len(self._pending) >= SCAN_BATCH:
+                    self._flush_pending()
+        self._flush_pending()
+
+    def _flush_pending(self):
+        # Sorting a batch and merging it once avoids a list insert per serial.
+        self.serials.extend(self._pending)
+        for note, values in self._pending_notes.items():
+            self.notes.setdefault(note, SerialRuns()).extend(values)
+        self._pending = []
+        self._pending_notes = {}
+
+    def _add_row(self, row):
+        self.rows += 1
+        key = _bucket_key(row.get("timestamp"))
+        if key:
+            self.hours[key] = self.hours.get(key, 0) + 1
+        u32 = _row_u32(row)
+        if u32 is None:
+            return
+        self._pending.append(u32)
+        note = (row.get("note") or "").strip()
+        if note:
+            self._pending_notes.setdefault(note, []).append(u32)
+
+    def counts(self, bucket="hour", start=None, end=None):
+        if bucket not in ("hour", "day"):
+            raise ValueError(f"Unbekannter Zeitraster: {bucket}")
+        width = 13 if bucket == "hour" else 10
+        start_key = _bound_key(start)
+        end_key = _bound_key(end, end=True)
+        result = {}
+        for key, count in self.hours.items():
+            if start_key and key < start_key:
+                continue
+            if end_key and key > end_key:
+                continue
+            bucket_key = key[:width]
+            result[bucket_key] = result.get(bucket_key, 0) + count
+        return sorted(result.items())
+
+    def throughput(self, start=None, end=None):
+        hourly = self.counts("hour", start, end)
+        total = sum(count for _key, count in hourly)
+        peak = max(hourly, key=lambda item: item[1]) if hourly else (None, 0)
+        return {
+            "total": total,
+            "active_hours": len(hourly),
+            "per_active_hour": total / len(hourly) if hourly else 0.0,
+            "peak_hour": peak[0],
+            "peak_count": peak[1],
+        }
+
+    def count_range(self, lo, hi):
+        return self.serials.count(lo, hi)
+
+    def range(self, lo, hi):
+        return (serial_row(u32) for u32 in self.serials.values(lo, hi))
+
+    def gaps(self, lo, hi):
+        return ({"start": f"{start:08X}", "end": f"{end:08X}", "missing": end - start + 1}
+                for start, end in self.serials.gaps(lo, hi))
+
+    def by_note(self, note):
+        runs = self.notes.get((note or "").strip())
+        if runs is None:
+            return iter(())
+        return (serial_row(u32) for u32 in runs.values())
+
+
+def open_index(csv_path, index_path=None, save=True):
+    index = SerialIndex(csv_path, index_path)
+    index.load()
+    index.refresh(save=save)
+    return index
+
+
+def write_csv(rows, out, fieldnames=None):
+    writer = None
+    if fieldnames:
+        writer = csv.DictWriter(out, fieldnames=fieldnames)
+        writer.writeheader()
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def write_json(rows, out, fieldnames=None):
+    out.write("[")
+    for i, row in enumerate(rows):
+        if i:
+            out.write(",")
+        out.write("\n")
+        out.write(json.dumps(row, ensure_ascii=True))
+    out.write("\n]\n")
+
+
+def _timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000.0
+
+
+def _scan_serials(csv_path, lo, hi):
+    _payloads, u32_set = load_serial_sets(csv_path)
+    return sorted(value for value in u32_set if lo <= value <= hi)
+
+
+def _scan_gaps(csv_path, lo, hi):
+    gaps = []
+    expected = lo
+    for value in _scan_serials(csv_path, lo, hi):
+        if value > expected:
+            gaps.append({"start": f"{expected:08X}", "end": f"{value - 1:08X}", "missing": value - expected})
+        expected = value + 1
+    if expected <= hi:
+        gaps.append({"start": f"{expected:08X}", "end": f"{hi:08X}", "missing": hi - expected + 1})
+    return gaps
+
+
+def _scan_days(csv_path):
+    days = {}
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            key = _bucket_key(row.get("timestamp"))
+            if key:
+                days[key[:10]] = days.get(key[:10], 0) + 1
+    return sorted(days.items())
+
+
+def _scan_note(csv_path, note):
+    found = set()
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if (row.get("note") or "").strip() == note:
+                u32 = _row_u32(row)
+                if u32 is not None:
+                    found.add(u32)
+    return [serial_row(u32) for u32 in sorted(found)]
+
+
+def _bench_serials(rows, layout):
+    if layout == "sparse":
+        # Random serials spread over the whole u32 space, appended out of order.
+        rng = random.Random(26)
+        return rng.sample(range(0x100000000), rows)
+    # Skip a serial now and then so the range has gaps to report.
+    serials = []
+    u32 = 0
+    for i in range(rows):
+        u32 += 2 if i % 997 == 0 else 1
+        serials.append(u32)
+    return serials
+
+
+def _write_bench_csv(csv_path, serials):
+    base = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "sn_text", "payload_hex", "u32_hex", "note"])
+        for i, u32 in enumerate(serials):
+            hex_value = f"{u32:08X}"
+            writer.writerow(
+                [
+                    (base + dt.timedelta(seconds=i * 3)).isoformat(),
+                    sn_from_bytes(u32.to_bytes(4, "big")),
+                    hex_value,
+                    hex_value,
+                    "Nacharbeit" if i % 5000 == 0 else "",
+                ]
+            )
+
+
+def _bench_layout(rows, layout, out):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = os.path.join(tmpdir, "serials.csv")
+        serials = _bench_serials(rows, layout)
+        _write_bench_csv(csv_path, serials)
+        ordered = sorted(serials)
+        # Gap window covers about 1% of the serials, range listing about 1000.
+        lo = ordered[len(ordered) // 2]
+        gap_hi = ordered[min(len(ordered) - 1, len(ordered) // 2 + max(1, rows // 100))]
+        range_hi = ordered[min(len(ordered) - 1, len(ordered) // 2 + 1000)]
+        index, build_ms = _timed(lambda: open_index(csv_path))
+        _index, reload_ms = _timed(lambda: open_index(csv_path))
+        index_kb = os.path.getsize(index.index_path) / 1024.0
+        cases = [
+            ("gaps", lambda: _scan_gaps(csv_path, lo, gap_hi), lambda: list(index.gaps(lo, gap_hi))),
+            ("counts/day", lambda: _scan_days(csv_path), lambda: index.counts("day")),
+            ("note", lambda: _scan_note(csv_path, "Nacharbeit"), lambda: list(index.by_note("Nacharbeit"))),
+            (
+                "count_range",
+                lambda: len(_scan_serials(csv_path, lo, gap_hi)),
+                lambda: index.count_range(lo, gap_hi),
+            ),
+            (
+                "range",
+                lambda: [serial_row(u32) for u32 in _scan_serials(csv_path, lo, range_hi)],
+                lambda: list(index.range(lo, range_hi)),
+            ),
+        ]
+        out.write(
+            f"layout={layout} rows={rows} index_build_ms={build_ms:.1f} "
+            f"index_reload_ms={reload_ms:.1f} index_kb={index_kb:.1f}\n"
+        )
+        for name, scan, indexed in cases:
+            expected, scan_ms = _timed(scan)
+            result, index_ms = _timed(indexed)
+            if result != expected:
+                raise RuntimeError(f"Bench {layout}/{name}: Index weicht vom Full-Scan ab.")
+            out.write(f"{name:12s} full_scan_ms={scan_ms:9.1f} index_ms={index_ms:8.3f}\n")
+
+
+def run_bench(rows, out, layouts=("sequential", "sparse")):
+    for layout in layouts:
+        _bench_layout(rows, layout, out)
+
+
+def _parse_u32(value):
+    try:
+        u32 = int(value, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungueltiger Hex-Wert: {value}") from None
+    if not 0 <= u32 <= 0xFFFFFFFF:
+        raise argparse.ArgumentTypeError(f"Wert ausserhalb 00000000..FFFFFFFF: {value}")
+    return u32
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Berichte ueber die Seriennummern-CSV.")
+    parser.add_argument("--csv", default="serials.csv")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    sub = parser.add_subparsers(dest="command", required=True)
+    counts = sub.add_parser("counts")
+    counts.add_argument("--bucket", choices=["hour", "day"], default="day")
+    counts.add_argument("--start")
+    counts.add_argument("--end")
+    throughput = sub.add_parser("throughput")
+    throughput.add_argument("--start")
+    throughput.add_argument("--end")
+    for name in ("range", "gaps"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("lo", type=_parse_u32)
+        cmd.add_argument("hi", type=_parse_u32)
+    note = sub.add_parser("note")
+    note.add_argument("note")
+    bench = sub.add_parser("bench")
+    bench.add_argument("--rows", type=int, default=1_000_000)
+    bench.add_argument("--layout", choices=["sequential", "sparse", "both"], default="both")
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        layouts = ("sequential", "sparse") if args.layout == "both" else (args.layout,)
+        run_bench(args.rows, sys.stdout, layouts)
+        return 0
+    if args.command in ("range", "gaps") and args.lo > args.hi:
+        parser.error(f"lo ({args.lo:08X}) ist groesser als hi ({args.hi:08X}).")
+    index = open_index(args.csv)
+    try:
+        if args.command == "counts":
+            counts = index.counts(args.bucket, args.start, args.end)
+            rows = ({"bucket": key, "count": count} for key, count in counts)
+            fieldnames = COUNT_FIELDS
+        elif args.command == "throughput":
+            rows = [index.throughput(args.start, args.end)]
+            fieldnames = THROUGHPUT_FIELDS
+        elif args.command == "range":
+            rows = index.range(args.lo, args.hi)
+            fieldnames = SERIAL_FIELDS
+        elif args.command == "gaps":
+            rows = index.gaps(args.lo, args.hi)
+            fieldnames = GAP_FIELDS
+        else:
+            rows = index.by_note(args.note)
+            fieldnames = SERIAL_FIELDS
+    except ValueError as exc:
+        parser.error(str(exc))
+    writer = write_json if args.format == "json" else write_csv
+    writer(rows, sys.stdout, fieldnames)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ import os
 DEFAULT_SETTINGS = {
     "output_dir": "output",
     "printer_name": "",
+    "printers": [],
+    "printer_strategy": "least_loaded",
     "sumatra_path": "",
     "quick_print": False,
 }
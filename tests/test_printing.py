@@ -0,0 +1,221 @@
+import threading
+import unittest
+
+from printing import PrinterPool, PrintJobError, parse_printer_list, pool_from_settings
+from settings import DEFAULT_SETTINGS
+
+
+class RecordingSink:
+    def __init__(self, failing=None):
+        self.failing = set(failing or [])
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, path, printer_name):
+        with self.lock:
+            self.calls.append((printer_name, path))
+            if printer_name in self.failing:
+                return False, f"{printer_name} offline"
+        return True, ""
+
+    def paths_for(self, printer_name):
+        with self.lock:
+            return [path for name, path in self.calls if name == printer_name]
+
+
+class BlockingSink(RecordingSink):
+    def __init__(self, blocked, failing=None):
+        super().__init__(failing)
+        self.blocked = set(blocked)
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def __call__(self, path, printer_name):
+        if printer_name in self.blocked:
+            self.started.set()
+            self.release.wait(5)
+        return super().__call__(path, printer_name)
+
+
+class BadPathSink(RecordingSink):
+    def __call__(self, path, printer_name):
+        super().__call__(path, printer_name)
+        if path == "bad.pdf":
+            raise PrintJobError("PDF nicht gefunden: bad.pdf")
+        return True, ""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PrinterPoolTests(unittest.TestCase):
+    def test_batch_split_keeps_order_per_printer(self):
+        sink = RecordingSink()
+        paths = [f"label_{i:02d}.pdf" for i in range(10)]
+        with PrinterPool(["p1", "p2", "p3"], sink=sink) as pool:
+            jobs = pool.submit_batch(paths)
+            self.assertTrue(pool.wait(jobs, timeout=5))
+        self.assertTrue(all(job.ok for job in jobs))
+        printed = []
+        for name in ["p1", "p2", "p3"]:
+            chunk = sink.paths_for(name)
+            self.assertEqual(chunk, sorted(chunk))
+            self.assertGreaterEqual(len(chunk), 3)
+            printed += chunk
+        self.assertEqual(printed, paths)
+
+    def test_least_loaded_prefers_emptier_queue(self):
+        sink = BlockingSink(blocked=["p1"])
+        with PrinterPool(["p1", "p2"], sink=sink) as pool:
+            first = pool.submit("a.pdf")
+            self.assertTrue(sink.started.wait(5))
+            second = pool.submit("b.pdf")
+            self.assertTrue(second.wait(5))
+            third = pool.submit("c.pdf")
+            self.assertTrue(third.wait(5))
+            self.assertEqual(pool.stats()["p1"]["queued"], 1)
+            sink.release.set()
+            self.assertTrue(first.wait(5))
+        self.assertEqual([first.printer, second.printer, third.printer], ["p1", "p2", "p2"])
+
+    def test_least_loaded_batch_levels_queues(self):
+        sink = BlockingSink(blocked=["p1"])
+        with PrinterPool(["p1", "p2"], sink=sink) as pool:
+            busy = pool.submit("busy.pdf")
+            self.assertTrue(sink.started.wait(5))
+            backlog = pool.submit_batch([f"q{i}.pdf" for i in range(4)])
+            self.assertTrue(pool.wait(backlog[1:], timeout=5))
+            self.assertEqual(pool.stats()["p1"]["queued"], 2)
+            lot = pool.submit_batch([f"n{i:02d}.pdf" for i in range(20)])
+            self.assertEqual(pool.stats()["p1"]["queued"], 11)
+            sink.release.set()
+            self.assertTrue(pool.wait([busy] + backlog + lot, timeout=5))
+        self.assertEqual(sink.paths_for("p1"), ["busy.pdf", "q0.pdf"] + [f"n{i:02d}.pdf" for i in range(9)])
+        self.assertEqual(sink.paths_for("p2"), ["q1.pdf", "q2.pdf", "q3.pdf"] + [f"n{i:02d}.pdf" for i in range(9, 20)])
+
+    def test_latency_and_throughput_stats(self):
+        clock = FakeClock()
+
+        def sink(path, printer_name):
+            clock.now += 0.5
+            return True, ""
+
+        with PrinterPool(["p1"], sink=sink, clock=clock) as pool:
+            self.assertTrue(pool.wait(pool.submit_batch(["a.pdf", "b.pdf"]), timeout=5))
+            stats = pool.stats()["p1"]
+        self.assertEqual(stats["ok"], 2)
+        self.assertAlmostEqual(stats["avg_latency"], 0.75)
+        self.assertAlmostEqual(stats["throughput"], 2.0)
+
+    def test_round_robin_rotates(self):
+        sink = RecordingSink()
+        with PrinterPool(["p1", "p2"], sink=sink, strategy="round_robin") as pool:
+            jobs = [pool.submit(f"{i}.pdf") for i in range(4)]
+            self.assertTrue(pool.wait(jobs, timeout=5))
+        self.assertEqual([job.printer for job in jobs], ["p1", "p2", "p1", "p2"])
+
+    def test_failed_printer_is_removed_and_restored(self):
+        clock = FakeClock()
+        sink = RecordingSink(failing=["p1"])
+        with PrinterPool(["p1", "p2"], sink=sink, retry_after=10.0, clock=clock) as pool:
+            job = pool.submit("a.pdf")
+            self.assertTrue(job.wait(5))
+            self.assertTrue(job.ok)
+            self.assertEqual(job.printer, "p2")
+            stats = pool.stats()
+            self.assertFalse(stats["p1"]["available"])
+            self.assertEqual(stats["p1"]["failed"], 1)
+            self.assertEqual(stats["p2"]["ok"], 1)
+
+            sink.failing.clear()
+            clock.now = 11.0
+            self.assertTrue(pool.stats()["p1"]["available"])
+            job = pool.submit("b.pdf")
+            self.assertTrue(job.wait(5))
+            self.assertEqual(job.printer, "p1")
+
+    def test_bad_job_does_not_take_down_pool(self):
+        sink = BadPathSink()
+        with PrinterPool(["p1", "p2", "p3"], sink=sink) as pool:
+            bad = pool.submit("bad.pdf")
+            self.assertTrue(bad.wait(5))
+            self.assertFalse(bad.ok)
+            self.assertIn("nicht gefunden", bad.error)
+            self.assertEqual(bad.failed_on, [])
+            self.assertTrue(all(entry["available"] for entry in pool.stats().values()))
+            good = pool.submit("good.pdf")
+            self.assertTrue(good.wait(5))
+            self.assertTrue(good.ok)
+
+    def test_failover_spreads_backlog(self):
+        sink = BlockingSink(blocked=["p1"], failing=["p1"])
+        with PrinterPool(["p1", "p2", "p3"], sink=sink, strategy="round_robin") as pool:
+            jobs = pool.submit_batch([f"{i}.pdf" for i in range(6)])
+            self.assertTrue(sink.started.wait(5))
+            sink.release.set()
+            self.assertTrue(pool.wait(jobs, timeout=5))
+        self.assertTrue(all(job.ok for job in jobs))
+        self.assertEqual(sink.paths_for("p2"), ["2.pdf", "3.pdf", "0.pdf"])
+        self.assertEqual(sink.paths_for("p3"), ["4.pdf", "5.pdf", "1.pdf"])
+
+    def test_close_during_failover_finishes_job(self):
+        sink = BlockingSink(blocked=["p1"], failing=["p1"])
+        pool = PrinterPool(["p1", "p2"], sink=sink)
+        job = pool.submit("a.pdf")
+        self.assertTrue(sink.started.wait(5))
+        pool.close(wait=False)
+        sink.release.set()
+        self.assertTrue(job.wait(5))
+        self.assertFalse(job.ok)
+        pool.close()
+
+    def test_all_printers_failing(self):
+        sink = RecordingSink(failing=["p1", "p2"])
+        with PrinterPool(["p1", "p2"], sink=sink) as pool:
+            job = pool.submit("a.pdf")
+            self.assertTrue(job.wait(5))
+            self.assertFalse(job.ok)
+            self.assertIn("offline", job.error)
+            self.assertEqual(job.failed_on, ["p1", "p2"])
+            late = pool.submit("b.pdf")
+            self.assertTrue(late.wait(0))
+            self.assertFalse(late.ok)
+            self.assertEqual(late.error, "Kein Drucker verfuegbar.")
+            self.assertEqual([entry["available"] for entry in pool.stats().values()], [False, False])
+
+    def test_dead_printers_leave_pool(self):
+        sink = RecordingSink(failing=["p1", "p2"])
+        with PrinterPool(["p1", "p2", "p3"], sink=sink) as pool:
+            jobs = [pool.submit(f"{i}.pdf") for i in range(4)]
+            self.assertTrue(pool.wait(jobs, timeout=5))
+            stats = pool.stats()
+        self.assertTrue(all(job.ok for job in jobs))
+        self.assertEqual({job.printer for job in jobs}, {"p3"})
+        self.assertEqual(sorted(sink.paths_for("p3")), ["0.pdf", "1.pdf", "2.pdf", "3.pdf"])
+        self.assertEqual([stats[name]["available"] for name in ["p1", "p2", "p3"]], [False, False, True])
+
+    def test_parse_printer_list_drops_duplicates(self):
+        self.assertEqual(parse_printer_list("a, a,b,, b "), ["a", "b"])
+
+    def test_pool_from_settings(self):
+        settings = DEFAULT_SETTINGS.copy()
+        with self.assertRaises(ValueError):
+            pool_from_settings(settings)
+        settings["printer_name"] = "single"
+        with pool_from_settings(settings, sink=RecordingSink()) as pool:
+            self.assertEqual(pool.printers(), ["single"])
+        settings["printers"] = "a,b"
+        with self.assertRaises(ValueError):
+            pool_from_settings(settings)
+        settings["printers"] = ["a", "b"]
+        with pool_from_settings(settings, sink=RecordingSink()) as pool:
+            self.assertEqual(pool.printers(), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from core import append_serial, load_serial_sets
+from reporting import SERIAL_FIELDS, SerialIndex, SerialRuns, main, open_index, run_bench, write_csv, write_json
+
+
+HEADER = ["timestamp", "sn_text", "payload_hex", "u32_hex", "note"]
+
+
+def write_rows(csv_path, rows, header=True):
+    with open(csv_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(HEADER)
+        for timestamp, u32, note in rows:
+            writer.writerow([timestamp, "", f"{u32:08X}", f"{u32:08X}", note])
+
+
+class SerialRunsTests(unittest.TestCase):
+    def test_add_merges_runs(self):
+        runs = SerialRuns()
+        for value in [5, 1, 3, 2, 7, 3]:
+            runs.add(value)
+        self.assertEqual(runs.runs(), [[1, 3], [5, 5], [7, 7]])
+        runs.add(6)
+        self.assertEqual(runs.runs(), [[1, 3], [5, 7]])
+        self.assertEqual(len(runs), 6)
+        self.assertEqual(list(runs.gaps(0, 9)), [(0, 0), (4, 4), (8, 9)])
+        self.assertEqual(list(runs.values(2, 5)), [2, 3, 5])
+        self.assertEqual(runs.count(2, 6), 4)
+
+
+    def test_extend_merges_unsorted_batch(self):
+        runs = SerialRuns()
+        runs.add(10)
+        runs.add(20)
+        runs.extend([21, 5, 9, 11, 5, 30, 7])
+        self.assertEqual(runs.runs(), [[5, 5], [7, 7], [9, 11], [20, 21], [30, 30]])
+        runs.extend([6, 8, 12])
+        self.assertEqual(runs.runs(), [[5, 12], [20, 21], [30, 30]])
+        runs.extend([])
+        self.assertEqual(len(runs), 11)
+
+
+class SerialIndexTests(unittest.TestCase):
+    def test_queries(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "serials.csv")
+            write_rows(
+                csv_path,
+                [
+                    ("2026-02-07T18:49:45+00:00", 0, ""),
+                    ("2026-02-07T18:59:00+00:00", 1, "Nacharbeit"),
+                    ("2026-02-07T19:01:00+00:00", 3, ""),
+                    ("2026-02-08T08:00:00+01:00", 4, "Nacharbeit"),
+                ],
+            )
+            index = open_index(csv_path)
+            self.assertEqual(
+                index.counts("hour"),
+                [("2026-02-07T18", 2), ("2026-02-07T19", 1), ("2026-02-08T07", 1)],
+            )
+            self.assertEqual(index.counts("day"), [("2026-02-07", 3), ("2026-02-08", 1)])
+            self.assertEqual(index.counts("day", start="2026-02-08"), [("2026-02-08", 1)])
+            self.assertEqual(index.counts("day", end="2026-02-07"), [("2026-02-07", 3)])
+            self.assertEqual(
+                index.counts("hour", start="2026-02-07T18:30"),
+                [("2026-02-07T18", 2), ("2026-02-07T19", 1), ("2026-02-08T07", 1)],
+            )
+            self.assertEqual(
+                index.counts("hour", start="2026-02-07T20:30+01:00", end="2026-02-07T20:59+01:00"),
+                [("2026-02-07T19", 1)],
+            )
+            with self.assertRaises(ValueError):
+                index.counts("hour", start="gestern")
+            self.assertEqual(index.throughput()["peak_hour"], "2026-02-07T18")
+            self.assertEqual(list(index.gaps(0, 5)), [
+                {"start": "00000002", "end": "00000002", "missing": 1},
+                {"start": "00000005", "end": "00000005", "missing": 1},
+            ])
+            self.assertEqual([row["sn_text"] for row in index.range(3, 10)], ["SN:00-00-00-03", "SN:00-00-00-04"])
+            self.assertEqual([row["u32_hex"] for row in index.by_note("Nacharbeit")], ["00000001", "00000004"])
+            self.assertEqual(list(index.by_note("fehlt")), [])
+
+    def test_incremental_refresh_matches_full_scan(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "serials.csv")
+            append_serial(csv_path, "SN:00-00-00-01", "00000001", "00000001", "")
+            index = open_index(csv_path)
+            self.assertTrue(os.path.exists(index.index_path))
+            offset = index.offset
+
+            append_serial(csv_path, "SN:00-00-00-02", "00000002", "00000002", "Muster")
+            with open(csv_path, "a", encoding="utf-8") as f:
+                f.write("2026-02-07T18:49:45+00:00,SN:00-00-00-09,00000009,000")
+            reloaded = SerialIndex(csv_path)
+            self.assertTrue(reloaded.load())
+            self.assertEqual(reloaded.offset, offset)
+            reloaded.refresh()
+            self.assertEqual(reloaded.rows, 2)
+            self.assertNotIn(9, reloaded.serials)
+
+            with open(csv_path, "a", encoding="utf-8") as f:
+                f.write("00009,\n")
+            reloaded.refresh()
+            _payloads, u32_set = load_serial_sets(csv_path)
+            self.assertEqual(set(reloaded.serials.values()), u32_set)
+            self.assertEqual(sum(count for _key, count in reloaded.counts("hour")), 3)
+
+            os.remove(csv_path)
+            write_rows(csv_path, [("2026-02-07T18:00:00+00:00", 7, "")])
+            rebuilt = open_index(csv_path)
+            self.assertEqual(rebuilt.serials.runs(), [[7, 7]])
+
+            os.remove(csv_path)
+            write_rows(csv_path, [("2026-02-07T18:00:00+00:00", value, "") for value in range(20, 40)])
+            rebuilt = open_index(csv_path)
+            self.assertEqual(rebuilt.serials.runs(), [[20, 39]])
+
+    def test_in_place_edits_trigger_rebuild(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "serials.csv")
+            write_rows(csv_path, [("2026-02-07T18:00:00+00:00", value, "alt") for value in range(3)])
+            open_index(csv_path)
+            with open(csv_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write(text.replace("alt", "neu", 1))
+            index = open_index(csv_path)
+            self.assertEqual([row["u32_hex"] for row in index.by_note("neu")], ["00000000"])
+            self.assertEqual(index.rows, 3)
+
+            lines = text.splitlines(keepends=True)
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.writelines([lines[0]] + lines[2:])
+            write_rows(csv_path, [("2026-02-07T19:00:00+00:00", value, "") for value in range(5, 9)], header=False)
+            index = open_index(csv_path)
+            self.assertEqual(index.serials.runs(), [[1, 2], [5, 8]])
+            self.assertEqual(index.rows, 6)
+
+    def test_sparse_serials_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "serials.csv")
+            values = [(i * 7919) % 100003 * 40009 for i in range(1, 500)]
+            write_rows(csv_path, [("2026-02-07T18:00:00+00:00", value, "") for value in values])
+            open_index(csv_path)
+            reloaded = SerialIndex(csv_path)
+            self.assertTrue(reloaded.load())
+            self.assertEqual(list(reloaded.serials.values()), sorted(set(values)))
+
+    def test_bench_matches_full_scan(self):
+        out = io.StringIO()
+        run_bench(3000, out)
+        self.assertIn("layout=sparse", out.getvalue())
+        self.assertIn("range", out.getvalue())
+
+    def test_cli_rejects_out_of_range_serials(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, "serials.csv")
+            for argv in (["gaps", "0", "FFFFFFFFF"], ["gaps", "--", "-1", "5"], ["range", "10", "5"], ["range", "0", "xyz"]):
+                with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                    main(["--csv", csv_path] + argv)
+
+    def test_stream_writers(self):
+        rows = [{"u32_hex": "00000001", "sn_text": "SN:00-00-00-01"}]
+        out = io.StringIO()
+        write_csv(iter(rows), out)
+        self.assertEqual(out.getvalue().splitlines(), ["u32_hex,sn_text", "00000001,SN:00-00-00-01"])
+        out = io.StringIO()
+        write_json(iter(rows), out)
+        self.assertEqual(json.loads(out.getvalue()), rows)
+        out = io.StringIO()
+        write_csv(iter([]), out, SERIAL_FIELDS)
+        self.assertEqual(out.getvalue().splitlines(), ["u32_hex,sn_text"])
+        out = io.StringIO()
+        write_json(iter([]), out)
+        self.assertEqual(json.loads(out.getvalue()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()